@@ -1,10 +1,47 @@
 import os
 import re
 import csv
+import multiprocessing
+import numpy as np
 import pandas as pd
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from difflib import SequenceMatcher
+from functools import lru_cache
 from typing import Dict, Any
 
+try:
+    from rapidfuzz import fuzz
+except ImportError:  # 未安装rapidfuzz时退回difflib
+    fuzz = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+except ImportError:  # 未安装pyarrow时用pd.read_csv读取
+    pa = pc = pacsv = None
+
+try:
+    import polars as pl
+except ImportError:  # 未安装polars时使用pandas的.str实现
+    pl = None
+
+try:
+    import ahocorasick
+except ImportError:  # 未安装pyahocorasick时用正则移除无关词
+    ahocorasick = None
+
+try:
+    from numba import njit
+except ImportError:  # 未安装numba时使用NumPy/纯Python的数值匹配
+    njit = None
+
+try:
+    import simsimd
+except ImportError:  # 未安装simsimd时逐行计算位图Jaccard
+    simsimd = None
+
 CSV_PATH = "chat_history_all.csv"
 OUT_DIR = "./eval_output"
 os.makedirs(OUT_DIR, exist_ok=True)
@@ -17,41 +54,127 @@ THRESHOLDS = {
     "list_match_threshold": 0.7,  # 降低列表匹配阈值
 }
 
+RESULT_COLUMNS = ["ai_answer", "expected_answer", "verdict", "combined_score", "seq_ratio", "issues"]
+
 def safe_str(x: Any) -> str:
     return "" if pd.isna(x) else str(x)
 
+_RE_DATE = re.compile(r'(\d{4})年(\d{1,2})月(\d{1,2})日')
+_RE_SEP = re.compile(r"[,\uFF0C;；和&]")
+_RE_YMD = re.compile(r"[年月日]")
+STOPWORDS = ("查询结果显示", "任务执行完成", "分别为", "如下", "的订单数量为", "其得分为")
+_RE_STOPWORDS = re.compile("(" + "|".join(map(re.escape, STOPWORDS)) + ")")
+_RE_FLOAT0 = re.compile(r"\.0\b")
+_RE_WS = re.compile(r"\s+")
+_RE_KEEP = re.compile(r"[^\w\u4e00-\u9fff%\.\-\/\s]")
+
+if ahocorasick is not None:
+    _STOPWORD_AUTOMATON = ahocorasick.Automaton()
+    for _w in STOPWORDS:
+        _STOPWORD_AUTOMATON.add_word(_w, len(_w))
+    _STOPWORD_AUTOMATON.make_automaton()
+else:
+    _STOPWORD_AUTOMATON = None
+
+def _strip_stopwords(s: str) -> str:
+    """一次Aho-Corasick扫描移除所有无关词，未安装pyahocorasick时退回正则替换。"""
+    if _STOPWORD_AUTOMATON is None:
+        return _RE_STOPWORDS.sub("", s)
+    parts, pos = [], 0
+    for end, length in _STOPWORD_AUTOMATON.iter(s):
+        start = end - length + 1
+        if start < pos:
+            continue
+        parts.append(s[pos:start])
+        pos = end + 1
+    if not parts:
+        return s
+    parts.append(s[pos:])
+    return "".join(parts)
+
 def normalize_date(s: str) -> str:
     """将中文日期格式（如2025年6月27日）转换为标准格式（如2025-06-27）。"""
-    s = safe_str(s)
-    date_pattern = r'(\d{4})年(\d{1,2})月(\d{1,2})日'
-    return re.sub(date_pattern, r'\1-\2-\3', s)
+    return _RE_DATE.sub(r'\1-\2-\3', safe_str(s))
 
+@lru_cache(maxsize=131072)
 def normalize_text(s: str) -> str:
-    """保留中文和英文，规范化文本，处理日期和数值格式。"""
+    """保留中文和英文，规范化文本，处理日期和数值格式。结果按输入缓存。"""
     s = safe_str(s).strip()
     s = normalize_date(s)
-    s = re.sub(r"[,\uFF0C;；和&]", " ", s)
-    s = re.sub(r"[年月日]", "-", s)
-    s = re.sub(r"(查询结果显示|任务执行完成|分别为|如下|的订单数量为|其得分为)", "", s)  # 移除更多无关词
-    s = re.sub(r"\.0\b", "", s)  # 统一浮点数格式（如88.0→88）
-    s = re.sub(r"\s+", " ", s)
-    s = re.sub(r"[^\w\u4e00-\u9fff%\.\-\/\s]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _RE_SEP.sub(" ", s)
+    s = _RE_YMD.sub("-", s)
+    s = _strip_stopwords(s)  # 移除更多无关词
+    s = _RE_FLOAT0.sub("", s)  # 统一浮点数格式（如88.0→88）
+    s = _RE_WS.sub(" ", s)
+    s = _RE_KEEP.sub(" ", s)
+    s = _RE_WS.sub(" ", s).strip()
     return s.lower()
 
-def is_contained(exp_raw: str, ai_raw: str) -> bool:
-    """检查标准答案是否包含在AI答案中，忽略标点、连接词和格式差异。"""
-    exp_clean = normalize_text(exp_raw)
-    ai_clean = normalize_text(ai_raw)
-    return exp_clean in ai_clean
+# Rust正则的\w不含上标等No类数字、\s不含\x1c-\x1f，凡依赖它们的步骤都按Python re的语义显式写出字符类
+_PL_RE_WS = r"[\s\x1c-\x1f]+"
+_PL_RE_KEEP = r"[^\p{L}\p{N}_\x{4e00}-\x{9fff}%\.\-/\s\x1c-\x1f]"
+# \.0\b：Rust正则不支持断言，改为捕获其后的非单词字符（或串尾）原样放回；
+# 一次匹配整段连续的".0"（如1.0.0.0.0），否则被捕获吞掉的"."会让下一个".0"漏掉
+_PL_RE_FLOAT0 = r"(?:\.0)+([^\p{L}\p{N}_]|$)"
+
+def _pl_normalize(texts: pd.Series) -> pd.Series:
+    """用polars（Rust正则）完成normalize_text的各步替换。"""
+    s = pl.Series(texts.tolist(), dtype=pl.String).str.strip_chars()
+    s = s.str.replace_all(_RE_DATE.pattern, "${1}-${2}-${3}")
+    s = s.str.replace_all(_RE_SEP.pattern, " ")
+    s = s.str.replace_all(_RE_YMD.pattern, "-")
+    s = s.str.replace_all(_RE_STOPWORDS.pattern, "")
+    s = s.str.replace_all(_PL_RE_FLOAT0, "${1}")
+    s = s.str.replace_all(_PL_RE_WS, " ")
+    s = s.str.replace_all(_PL_RE_KEEP, " ")
+    s = s.str.replace_all(_PL_RE_WS, " ").str.strip_chars()
+    return pd.Series(s.str.to_lowercase().to_list(), index=texts.index, dtype=object)
+
+def _batch_normalize(series: pd.Series) -> pd.Series:
+    """normalize_text的列向量化版本，整列一次性完成各步正则替换；可用时交给polars。"""
+    if pl is not None:
+        return _pl_normalize(series.fillna("").astype(str))
+    # 转为object再做.str操作：pyarrow字符串列的lower()等走Arrow内核，与Python语义不完全一致
+    s = series.fillna("").astype(str).astype(object).str.strip()
+    s = s.str.replace(_RE_DATE, r'\1-\2-\3', regex=True)
+    s = s.str.replace(_RE_SEP, " ", regex=True)
+    s = s.str.replace(_RE_YMD, "-", regex=True)
+    # .map会把结果重新推断为Arrow字符串列，这里显式重建为object列
+    s = pd.Series([_strip_stopwords(x) for x in s], index=s.index, dtype=object)
+    s = s.str.replace(_RE_FLOAT0, "", regex=True)
+    s = s.str.replace(_RE_WS, " ", regex=True)
+    s = s.str.replace(_RE_KEEP, " ", regex=True)
+    s = s.str.replace(_RE_WS, " ", regex=True).str.strip()
+    return s.str.lower()
+
+_DASH_TO_SPACE = str.maketrans({'-': ' '})
+
+def _split_tokens(s: str) -> frozenset:
+    """按空格和连字符切分规范化文本，返回词集合。AI答案几乎不重复，直接调用不经缓存。"""
+    # 规范化后只剩单个空格，split(" ")与re.split(r'\s+|[-]')结果一致（保留空串）
+    return frozenset(s.translate(_DASH_TO_SPACE).split(" "))
+
+# 标准答案重复率高，按文本缓存词集合
+_tokens = lru_cache(maxsize=131072)(_split_tokens)
+
+# normalize_text中会删除文本或依赖上下文改写的步骤（日期/年月日、".0"、无关词、希腊字母词尾σ），
+# 原文含这些内容时"原文包含"不能推出"规范化后包含"，须走完整规范化
+_RE_RAW_UNSAFE = re.compile(r"\.0|[年月日Σ]")
+
+def _raw_contained(exp_raw: str, ai_raw: str) -> bool:
+    """原文直接包含标准答案、且规范化不会删改AI原文时，可跳过规范化直接判为包含。"""
+    return (bool(exp_raw) and exp_raw in ai_raw and not _RE_RAW_UNSAFE.search(ai_raw)
+            and not any(w in ai_raw for w in STOPWORDS))
+
+def is_contained(norm_exp: str, norm_ai: str) -> bool:
+    """检查标准答案是否包含在AI答案中（入参为normalize_text后的文本）。"""
+    return norm_exp in norm_ai
 
-def is_list_match(exp_raw: str, ai_raw: str) -> tuple[bool, float]:
+def is_list_match(norm_exp: str, norm_ai: str) -> tuple[bool, float]:
     """检查列表型答案是否内容一致（忽略顺序），返回是否匹配及Jaccard相似度。"""
-    exp_clean = normalize_text(exp_raw)
-    ai_clean = normalize_text(ai_raw)
     # 分割为键值对
-    exp_items = set(re.split(r'\s+|[-]', exp_clean))
-    ai_items = set(re.split(r'\s+|[-]', ai_clean))
+    exp_items = _tokens(norm_exp)
+    ai_items = _split_tokens(norm_ai)
     # 计算Jaccard相似度
     intersection = len(exp_items & ai_items)
     union = len(exp_items | ai_items)
@@ -59,13 +182,11 @@ def is_list_match(exp_raw: str, ai_raw: str) -> tuple[bool, float]:
     is_match = jaccard >= THRESHOLDS["list_match_threshold"]
     return is_match, jaccard
 
-def extract_relevant_text(ai_raw: str, exp_raw: str) -> str:
+def extract_relevant_text(norm_ai: str, norm_exp: str) -> str:
     """提取AI答案中与标准答案相关的核心内容，处理键值对。"""
-    norm_exp = normalize_text(exp_raw)
-    keywords = set(re.split(r'\s+|[-]', norm_exp))
-    norm_ai = normalize_text(ai_raw)
+    keywords = _tokens(norm_exp)
     # 按键值对分割
-    ai_items = re.split(r'\s+|[-]', norm_ai)
+    ai_items = norm_ai.translate(_DASH_TO_SPACE).split(" ")
     relevant_items = [item for item in ai_items if item in keywords]
     return ' '.join(relevant_items) if relevant_items else norm_ai
 
@@ -77,21 +198,131 @@ def extract_numbers(s: str) -> list:
     nums = NUMBER_RE.findall(s)
     return [float(x) for x in nums] if nums else []
 
+def extract_numbers_batch(series: pd.Series) -> list:
+    """extract_numbers的整列版本，返回每行一个float64数组。"""
+    texts = series.fillna("").astype(str)
+    if pl is not None:
+        found = (
+            pl.Series(texts.tolist(), dtype=pl.String)
+            .str.replace_all(",", "", literal=True)
+            .str.extract_all(NUMBER_RE.pattern)
+        )
+        # Rust的\d同样匹配全角等Unicode数字，polars的Float64转换解析不了，交给Python float
+        return [np.array([float(x) for x in nums], dtype=np.float64) for nums in found.to_list()]
+    found = texts.str.replace(",", "", regex=False).str.findall(NUMBER_RE)
+    return [np.array(nums, dtype=np.float64) for nums in found]
+
 def is_close_num(a: float, b: float) -> bool:
     return abs(a - b) <= max(THRESHOLDS["numeric_tol_abs"], abs(b) * THRESHOLDS["numeric_tol_rel"])
 
+def _match_nums(ai: np.ndarray, exp: np.ndarray, tol_abs: float, tol_rel: float) -> int:
+    """count_num_matches的纯数值内核，供numba编译。"""
+    used = np.zeros(ai.shape[0], dtype=np.bool_)
+    matches = 0
+    for i in range(exp.shape[0]):
+        e = exp[i]
+        tol = max(tol_abs, abs(e) * tol_rel)
+        for j in range(ai.shape[0]):
+            if not used[j] and abs(ai[j] - e) <= tol:
+                used[j] = True
+                matches += 1
+                break
+    return matches
+
+match_nums = njit(cache=True)(_match_nums) if njit is not None else None
+
+def count_num_matches(nums_ai: list, nums_exp: list) -> int:
+    """按顺序为每个标准数值贪心匹配一个尚未使用的相近AI数值，返回匹配数。"""
+    if match_nums is not None:
+        return int(match_nums(np.asarray(nums_ai, dtype=np.float64), np.asarray(nums_exp, dtype=np.float64),
+                              THRESHOLDS["numeric_tol_abs"], THRESHOLDS["numeric_tol_rel"]))
+    if len(nums_exp) * len(nums_ai) <= 16:
+        # 小规模时直接循环，NumPy的开销反而更大
+        used = [False] * len(nums_ai)
+        matches = 0
+        for e in nums_exp:
+            for i, a in enumerate(nums_ai):
+                if not used[i] and is_close_num(a, e):
+                    used[i] = True
+                    matches += 1
+                    break
+        return matches
+    ai = np.asarray(nums_ai, dtype=np.float64)
+    exp = np.asarray(nums_exp, dtype=np.float64)
+    tol = np.maximum(THRESHOLDS["numeric_tol_abs"], np.abs(exp) * THRESHOLDS["numeric_tol_rel"])
+    close = np.abs(ai[None, :] - exp[:, None]) <= tol[:, None]
+    used = np.zeros(len(ai), dtype=bool)
+    matches = 0
+    for row in close:
+        j = np.argmax(row & ~used)
+        if row[j] and not used[j]:
+            used[j] = True
+            matches += 1
+    return matches
+
 def seq_ratio(a: str, b: str) -> float:
+    if fuzz is not None:
+        return fuzz.ratio(a, b) / 100.0
     return SequenceMatcher(None, a, b).ratio()
 
 def token_jaccard(a: str, b: str) -> float:
     sa, sb = set(a.split()), set(b.split())
     return len(sa & sb) / len(sa | sb) if sa and sb else 0.0
 
-def evaluate_row(ai: str, expected: str) -> Dict[str, Any]:
+def bitset_jaccard(a_mask: int, b_mask: int) -> float:
+    """以整数位图表示的两个词集合的Jaccard相似度。"""
+    union = (a_mask | b_mask).bit_count()
+    return (a_mask & b_mask).bit_count() / union if union else 0.0
+
+def encode_token_masks(ai_norms, exp_norms) -> list:
+    """为AI答案和标准答案两列规范化文本建立共享词表，将每行的词集合编码为整数位图。"""
+    vocab: Dict[str, int] = {}
+    encoded = []
+    for column, tokenize in [(ai_norms, _split_tokens), (exp_norms, _tokens)]:
+        masks = np.empty(len(column), dtype=object)
+        for i, text in enumerate(column):
+            mask = 0
+            for tok in tokenize(text):
+                mask |= 1 << vocab.setdefault(tok, len(vocab))
+            masks[i] = mask
+        encoded.append(masks)
+    return encoded
+
+def _pack_masks(masks, nbytes: int) -> np.ndarray:
+    """将整数位图打包为 (N, nbytes) 的uint8矩阵。"""
+    buf = b"".join(int(m).to_bytes(nbytes, "little") for m in masks)
+    return np.frombuffer(buf, dtype=np.uint8).reshape(len(masks), nbytes)
+
+def batch_bitset_jaccard(a_masks, b_masks, chunk_size: int = 4096) -> np.ndarray:
+    """逐行计算两组位图的Jaccard相似度；可用时交给SimSIMD批量计算，否则逐行popcount。"""
+    n = len(a_masks)
+    if simsimd is None or n == 0:
+        return np.array([bitset_jaccard(a, b) for a, b in zip(a_masks, b_masks)], dtype=np.float64)
+    nbits = max(max(int(m).bit_length() for m in a_masks), max(int(m).bit_length() for m in b_masks), 1)
+    nbytes = (nbits + 7) // 8
+    out = np.empty(n, dtype=np.float64)
+    # 分块打包，避免行数和词表都很大时一次性生成 N×V 的矩阵
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        a_bits = _pack_masks(a_masks[start:stop], nbytes)
+        b_bits = _pack_masks(b_masks[start:stop], nbytes)
+        dist = np.asarray(simsimd.jaccard(a_bits, b_bits, "bin8"), dtype=np.float64)
+        # 1 - 距离 会在末位产生误差，取整避免 0.7 这类阈值边界被误判
+        out[start:stop] = np.round(1.0 - dist, 12)
+    return out
+
+def evaluate_row(ai: str, expected: str, ai_norm: str = None, exp_norm: str = None,
+                 list_jacc: float = None, nums_ai=None, nums_exp=None) -> Dict[str, Any]:
+    """评估单行答案；ai_norm/exp_norm/list_jacc/nums_ai/nums_exp为批量预计算结果，缺省时现场计算。"""
     ai_raw, exp_raw = safe_str(ai), safe_str(expected)
 
-    # --- 特殊规则：短答案包含判断 ---
-    if exp_raw and is_contained(exp_raw, ai_raw):
+    # --- 特殊规则：短答案包含判断（原文直接包含且规范化不会删改原文时无需规范化） ---
+    contained = _raw_contained(exp_raw, ai_raw)
+    if not contained:
+        norm_ai_full = normalize_text(ai_raw) if ai_norm is None else ai_norm
+        norm_exp = normalize_text(exp_raw) if exp_norm is None else exp_norm
+        contained = bool(exp_raw) and is_contained(norm_exp, norm_ai_full)
+    if contained:
         return {
             "ai_answer": ai_raw,
             "expected_answer": exp_raw,
@@ -102,7 +333,11 @@ def evaluate_row(ai: str, expected: str) -> Dict[str, Any]:
         }
 
     # --- 特殊规则：列表匹配 ---
-    is_match, list_jaccard = is_list_match(exp_raw, ai_raw)
+    if list_jacc is None:
+        is_match, list_jaccard = is_list_match(norm_exp, norm_ai_full)
+    else:
+        list_jaccard = list_jacc
+        is_match = list_jaccard >= THRESHOLDS["list_match_threshold"]
     if is_match:
         return {
             "ai_answer": ai_raw,
@@ -113,31 +348,34 @@ def evaluate_row(ai: str, expected: str) -> Dict[str, Any]:
             "issues": "顺序可能不同但内容一致"
         }
 
-    norm_exp = normalize_text(exp_raw)
-    norm_ai = extract_relevant_text(ai_raw, exp_raw)
-    nums_ai, nums_exp = extract_numbers(ai_raw), extract_numbers(exp_raw)
-
-    ratio = seq_ratio(norm_ai, norm_exp)
-    jacc = token_jaccard(norm_ai, norm_exp)
-    issues, numeric_match = [], None
+    if nums_ai is None:
+        nums_ai = extract_numbers(ai_raw)
+    if nums_exp is None:
+        nums_exp = extract_numbers(exp_raw)
+    issues = []
 
     # 数值匹配
-    if nums_exp:
-        matched_nums = []
-        ai_nums_copy = nums_ai.copy()
-        for e in nums_exp:
-            for a in ai_nums_copy:
-                if is_close_num(a, e):
-                    matched_nums.append(a)
-                    ai_nums_copy.remove(a)
-                    break
-        num_score = min(1.0, len(matched_nums) / len(nums_exp)) if nums_exp else 0.5
-        numeric_match = len(matched_nums) == len(nums_exp)
-        if not numeric_match:
-            issues.append(f"数值部分匹配（{len(matched_nums)}/{len(nums_exp)}）")
+    if len(nums_exp):
+        matches = count_num_matches(nums_ai, nums_exp)
+        num_score = min(1.0, matches / len(nums_exp))
+        # 数值完全匹配优先：直接判定正确，无需再计算文本相似度
+        if matches == len(nums_exp):
+            return {
+                "ai_answer": ai_raw,
+                "expected_answer": exp_raw,
+                "verdict": "正确",
+                "combined_score": 1.0,
+                "seq_ratio": 1.0,
+                "issues": "数值完全匹配"
+            }
+        issues.append(f"数值部分匹配（{matches}/{len(nums_exp)}）")
     else:
         num_score = 0.5
 
+    norm_ai = extract_relevant_text(norm_ai_full, norm_exp)
+    ratio = seq_ratio(norm_ai, norm_exp)
+    jacc = token_jaccard(norm_ai, norm_exp)
+
     # 诊断
     if not norm_ai:
         issues.append("AI答案为空")
@@ -150,17 +388,6 @@ def evaluate_row(ai: str, expected: str) -> Dict[str, Any]:
     elif set(norm_ai.split()) == set(norm_exp.split()) and ratio < 0.8:
         issues.append("顺序差异")
 
-    # 数值完全匹配优先
-    if nums_exp and numeric_match:
-        return {
-            "ai_answer": ai_raw,
-            "expected_answer": exp_raw,
-            "verdict": "正确",
-            "combined_score": 1.0,
-            "seq_ratio": 1.0,
-            "issues": "数值完全匹配"
-        }
-
     # 综合打分
     combined = ratio * 0.2 + jacc * 0.15 + num_score * 0.45 + list_jaccard * 0.2
 
@@ -180,30 +407,212 @@ def evaluate_row(ai: str, expected: str) -> Dict[str, Any]:
         "issues": "; ".join(issues)
     }
 
-def evaluate_csv(path: str) -> pd.DataFrame:
-    df = pd.read_csv(path).fillna("")
-    results = []
-    for idx, row in df.iterrows():
-        row_id = row.get("id", f"row_{idx+1}") or f"row_{idx+1}"
-        res = evaluate_row(row.get("content", ""), row.get("expected_answer", ""))
-        results.append({
-            "id": row_id,
-            "file_name": row.get("file_name", ""),
-            **res
-        })
-    return pd.DataFrame(results)
+def _column(df: pd.DataFrame, name: str, default: Any = "") -> np.ndarray:
+    """按列名取出对象数组，缺失列时以默认值填充。"""
+    if name in df.columns:
+        return df[name].to_numpy(dtype=object)
+    return np.full(len(df), default, dtype=object)
+
+def evaluate_batch(contents, expected) -> list:
+    """批量评估AI答案与标准答案，按输入顺序返回每行的评估结果。
+
+    原文直接包含标准答案且规范化不会删改原文的行由evaluate_row的快速路径处理，其余行批量预计算后逐行评估。
+    """
+    ai_raws = pd.Series(contents, dtype=object).fillna("").astype(str).to_numpy(dtype=object)
+    exp_raws = pd.Series(expected, dtype=object).fillna("").astype(str).to_numpy(dtype=object)
+    results = [None] * len(ai_raws)
+    rest = []
+    for i, (a, e) in enumerate(zip(ai_raws, exp_raws)):
+        if _raw_contained(e, a):
+            results[i] = evaluate_row(a, e)
+        else:
+            rest.append(i)
+    ai_raws, exp_raws = ai_raws[rest], exp_raws[rest]
+
+    ai_norms = _batch_normalize(pd.Series(ai_raws, dtype=object)).to_numpy(dtype=object)
+    exp_norms = _batch_normalize(pd.Series(exp_raws, dtype=object)).to_numpy(dtype=object)
+    ai_masks, exp_masks = encode_token_masks(ai_norms, exp_norms)
+    list_jaccs = batch_bitset_jaccard(ai_masks, exp_masks).tolist()  # 转回Python float，与evaluate_row的返回类型一致
+    ai_nums = extract_numbers_batch(pd.Series(ai_raws, dtype=object))
+    exp_nums = extract_numbers_batch(pd.Series(exp_raws, dtype=object))
+    for i, c, e, an, en, lj, na, ne in zip(rest, ai_raws, exp_raws, ai_norms, exp_norms, list_jaccs, ai_nums, exp_nums):
+        results[i] = evaluate_row(c, e, an, en, lj, na, ne)
+    return results
+
+OUTPUT_COLUMNS = ["id", "file_name"] + RESULT_COLUMNS
+VERDICTS = ["正确", "部分正确", "错误"]
+SAMPLE_SIZE = 5
+# 判定用分类编码、分数用float32，减小结果表内存并让按判定筛选/分组走整数编码
+RESULT_DTYPES = {
+    "verdict": pd.CategoricalDtype(VERDICTS),
+    "combined_score": "float32",
+    "seq_ratio": "float32",
+}
+
+def _frame_inputs(df: pd.DataFrame, offset: int = 0) -> tuple:
+    """取出评估所需的列；缺失的id按全局行号补为row_N。"""
+    ids = [rid or f"row_{offset+i+1}" for i, rid in enumerate(_column(df, "id"))]
+    return _column(df, "content"), _column(df, "expected_answer"), ids, _column(df, "file_name")
+
+def _evaluate_chunks(chunks, workers: int):
+    """按输入顺序逐块产出 (ids, file_names, results)。
+
+    多块输入时整块提交到进程池并行评估（避免逐行进程间通信），最多保留 workers*2 个
+    未完成的块以限制内存；单进程或只有一块输入时直接在本进程评估。进程池用spawn启动：
+    polars等库在本进程里已起了线程池，fork出的子进程会因继承的锁而卡死。
+    """
+    offset, pending, pool = 0, deque(), None
+    chunks = iter(chunks)
+    chunk = next(chunks, None)
+    try:
+        while chunk is not None:
+            next_chunk = next(chunks, None)
+            contents, expected, ids, file_names = _frame_inputs(chunk.fillna(""), offset)
+            offset += len(ids)
+            chunk = next_chunk
+            if workers <= 1 or (pool is None and next_chunk is None):
+                yield ids, file_names, evaluate_batch(contents, expected)
+                continue
+            if pool is None:
+                pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            pending.append((ids, file_names, pool.submit(evaluate_batch, contents, expected)))
+            if len(pending) >= workers * 2:
+                ids, file_names, future = pending.popleft()
+                yield ids, file_names, future.result()
+        while pending:
+            ids, file_names, future = pending.popleft()
+            yield ids, file_names, future.result()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+INPUT_COLUMNS = ["id", "content", "expected_answer", "file_name"]
+
+def _arrow_convert_options():
+    """只读取评估用到的列，统一按字符串读入；缺失的列以空值补齐。"""
+    return pacsv.ConvertOptions(
+        column_types={c: pa.large_string() for c in INPUT_COLUMNS},
+        include_columns=INPUT_COLUMNS,
+        include_missing_columns=True,
+    )
+
+def _pandas_read_options() -> dict:
+    """未安装pyarrow时与Arrow读取保持一致：只读评估列，全按字符串读入，不把"NA"等识别为空值。"""
+    return dict(dtype=str, keep_default_na=False, usecols=lambda c: c in INPUT_COLUMNS)
+
+def _arrow_parse_options():
+    """回答内容常含换行，允许引号内的字段跨行。"""
+    return pacsv.ParseOptions(newlines_in_values=True)
+
+def _arrow_to_frame(table) -> pd.DataFrame:
+    """空值填为空串后零拷贝转为ArrowDtype列的DataFrame。"""
+    table = pa.table({name: pc.fill_null(table[name], "") for name in table.column_names})
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+def read_csv_chunks(path: str, chunk_size: int):
+    """按chunk_size行分块读取CSV；可用时用pyarrow流式读取，文本列保持为Arrow字符串。"""
+    if pacsv is None:
+        yield from pd.read_csv(path, chunksize=chunk_size, **_pandas_read_options())
+        return
+    buf, rows = [], 0
+    for batch in pacsv.open_csv(path, parse_options=_arrow_parse_options(), convert_options=_arrow_convert_options()):
+        buf.append(batch)
+        rows += batch.num_rows
+        while rows >= chunk_size:
+            table = pa.Table.from_batches(buf)
+            yield _arrow_to_frame(table.slice(0, chunk_size))
+            rest = table.slice(chunk_size)
+            buf, rows = rest.to_batches(), rest.num_rows
+    if rows:
+        yield _arrow_to_frame(pa.Table.from_batches(buf))
+
+def read_csv(path: str) -> pd.DataFrame:
+    if pacsv is None:
+        return pd.read_csv(path, **_pandas_read_options())
+    return _arrow_to_frame(pacsv.read_csv(path, parse_options=_arrow_parse_options(), convert_options=_arrow_convert_options()))
+
+def evaluate_csv(path: str, chunk_size: int = 2000, workers: int = 1) -> pd.DataFrame:
+    """读取并评估整个CSV，返回结果表。默认单进程；workers>1时用spawn进程池，调用方须在
+    if __name__ == "__main__" 保护下调用。"""
+    df = read_csv(path)
+    chunks = (df.iloc[i:i + chunk_size] for i in range(0, len(df), chunk_size))
+    ids, file_names, results = [], [], []
+    for chunk_ids, chunk_files, chunk_results in _evaluate_chunks(chunks, workers):
+        ids += chunk_ids
+        file_names.extend(chunk_files)
+        results += chunk_results
+    meta = pd.DataFrame({"id": ids, "file_name": file_names})
+    res = pd.DataFrame.from_records(results, columns=RESULT_COLUMNS).astype(RESULT_DTYPES)
+    return pd.concat([meta, res], axis=1)
+
+def evaluate_csv_stream(path: str, out_csv: str, chunk_size: int = 2000, workers: int = None) -> Dict[str, Any]:
+    """分块读取并评估CSV，逐行写出明细结果，同时在线累计汇总统计。
+
+    workers缺省时按CPU核数用spawn进程池并行评估，调用方须在 if __name__ == "__main__" 保护下调用。
+    """
+    counts = dict.fromkeys(VERDICTS, 0)
+    samples = {v: [] for v in VERDICTS}
+    issue_counts = Counter()
+    total, mean_score = 0, 0.0
+    with open(out_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=OUTPUT_COLUMNS, quoting=csv.QUOTE_ALL, lineterminator="\n")
+        writer.writeheader()
+        chunks = read_csv_chunks(path, chunk_size)
+        for ids, file_names, results in _evaluate_chunks(chunks, workers or os.cpu_count() or 1):
+            for rid, fname, res in zip(ids, file_names, results):
+                row = {"id": rid, "file_name": fname, **res}
+                writer.writerow(row)
+                total += 1
+                mean_score += (row["combined_score"] - mean_score) / total
+                counts[row["verdict"]] += 1
+                if len(samples[row["verdict"]]) < SAMPLE_SIZE:
+                    samples[row["verdict"]].append(row)
+                for tok in row["issues"].split("; "):
+                    if tok.strip():
+                        issue_counts[tok.strip()] += 1
+            f.flush()
+    return {
+        "total": total,
+        "counts": counts,
+        "avg_score": round(mean_score, 4),
+        "samples": samples,
+        "issue_counts": dict(issue_counts.most_common()),
+        "detailed_csv": out_csv,
+    }
 
 def summarize_and_write(res_df: pd.DataFrame):
-    total = len(res_df)
-    correct, partial, wrong = (res_df["verdict"] == "正确").sum(), (res_df["verdict"] == "部分正确").sum(), (res_df["verdict"] == "错误").sum()
-    avg_score = res_df["combined_score"].mean().round(4)
-    accuracy = round(correct / total * 100, 2) if total else 0.0
+    # float32分数输出前还原为四位小数，避免写出 0.22499999403953552 这类值
+    res_df = res_df.assign(**{c: res_df[c].astype("float64").round(4) for c in ("combined_score", "seq_ratio")})
+    out_csv = os.path.join(OUT_DIR, "detailed_results.csv")
+    res_df.to_csv(out_csv, index=False, quoting=csv.QUOTE_ALL)
 
-    issue_list = res_df["issues"].str.split("; ").explode().dropna().str.strip()
-    issue_list = issue_list[issue_list != ""]
-    issue_counts = issue_list.value_counts().to_dict()
+    issue_counts = Counter()
+    for issues in res_df["issues"].to_numpy(dtype=object):
+        if not issues:
+            continue
+        for tok in issues.split("; "):
+            tok = tok.strip()
+            if tok:
+                issue_counts[tok] += 1
 
-    res_df.to_csv(os.path.join(OUT_DIR, "detailed_results.csv"), index=False, quoting=csv.QUOTE_ALL)
+    groups = res_df.groupby("verdict", sort=False, observed=True)
+    counts = groups.size()
+    heads = {v: grp.to_dict("records") for v, grp in groups.head(SAMPLE_SIZE).groupby("verdict", sort=False, observed=True)}
+
+    write_summary({
+        "total": len(res_df),
+        "counts": {v: int(counts.get(v, 0)) for v in VERDICTS},
+        "avg_score": round(res_df["combined_score"].mean(), 4),
+        "samples": {v: heads.get(v, []) for v in VERDICTS},
+        "issue_counts": dict(issue_counts.most_common()),
+        "detailed_csv": out_csv,
+    })
+
+def write_summary(stats: Dict[str, Any]):
+    """根据汇总统计生成评估报告，全部题目结果从明细CSV逐行读取写出。"""
+    total, counts, samples = stats["total"], stats["counts"], stats["samples"]
+    correct, partial, wrong = counts["正确"], counts["部分正确"], counts["错误"]
+    accuracy = round(correct / total * 100, 2) if total else 0.0
 
     md_lines = [
         "## 评估报告\n",
@@ -212,47 +621,41 @@ def summarize_and_write(res_df: pd.DataFrame):
         f"- 正确任务数: {correct}",
         f"- 错误任务数: {wrong}",
         f"- 部分正确: {partial}",
-        f"- 平均分: {avg_score}",
+        f"- 平均分: {stats['avg_score']}",
         f"- 准确率: {accuracy}%\n",
         "### 代表性正确案例"
     ]
-    for _, r in res_df[res_df["verdict"] == "正确"].head(5).iterrows():
-        md_lines += [
-            f"- [{r['id']}] AI答案: \n\n{r['ai_answer']}",
-            f"  - 标准答案: {r['expected_answer']}",
+    for r in samples["正确"]:
+        md_lines.append(
+            f"- [{r['id']}] AI答案: \n\n{r['ai_answer']}\n"
+            f"  - 标准答案: {r['expected_answer']}\n"
             f"  - 说明: 判定为{r['verdict']}（score={r['combined_score']}, seq_ratio={r['seq_ratio']})\n"
-        ]
-    md_lines.append("### 代表性错误案例")
-    for _, r in res_df[res_df["verdict"] == "错误"].head(5).iterrows():
-        md_lines += [
-            f"- [{r['id']}] AI答案: \n\n{r['ai_answer']}",
-            f"  - 标准答案: {r['expected_answer']}",
-            f"  - 说明: {r['issues']} (score={r['combined_score']}, seq_ratio={r['seq_ratio']})\n"
-        ]
-    md_lines.append("### 代表性部分正确案例")
-    for _, r in res_df[res_df["verdict"] == "部分正确"].head(5).iterrows():
-        md_lines += [
-            f"- [{r['id']}] AI答案: \n\n{r['ai_answer']}",
-            f"  - 标准答案: {r['expected_answer']}",
-            f"  - 说明: {r['issues']} (score={r['combined_score']}, seq_ratio={r['seq_ratio']})\n"
-        ]
+        )
+    for title, verdict in (("### 代表性错误案例", "错误"), ("### 代表性部分正确案例", "部分正确")):
+        md_lines.append(title)
+        for r in samples[verdict]:
+            md_lines.append(
+                f"- [{r['id']}] AI答案: \n\n{r['ai_answer']}\n"
+                f"  - 标准答案: {r['expected_answer']}\n"
+                f"  - 说明: {r['issues']} (score={r['combined_score']}, seq_ratio={r['seq_ratio']})\n"
+            )
     md_lines.append("### 全部题目结果")
-    for _, r in res_df.iterrows():
-        md_lines += [
-            f"- [{r['id']}] (文件: {r['file_name']})",
-            f"  - AI答案: {r['ai_answer']}",
-            f"  - 标准答案: {r['expected_answer']}",
-            f"  - 判定: {r['verdict']}",
-            f"  - score={r['combined_score']}, seq_ratio={r['seq_ratio']}, issues={r['issues']}\n"
-        ]
-    md_lines.append("### 错误类型总结")
-    for issue, cnt in issue_counts.items():
-        md_lines.append(f"- {issue}: {cnt} 次")
-
-    with open(os.path.join(OUT_DIR, "evaluation_report.md"), "w", encoding="utf-8") as f:
+
+    with open(os.path.join(OUT_DIR, "evaluation_report.md"), "w", encoding="utf-8") as f, \
+            open(stats["detailed_csv"], newline="", encoding="utf-8") as detail:
         f.write("\n".join(md_lines))
+        for r in csv.DictReader(detail):
+            f.write(
+                f"\n- [{r['id']}] (文件: {r['file_name']})\n"
+                f"  - AI答案: {r['ai_answer']}\n"
+                f"  - 标准答案: {r['expected_answer']}\n"
+                f"  - 判定: {r['verdict']}\n"
+                f"  - score={r['combined_score']}, seq_ratio={r['seq_ratio']}, issues={r['issues']}\n"
+            )
+        f.write("\n### 错误类型总结")
+        f.write("".join(f"\n- {issue}: {cnt} 次" for issue, cnt in stats["issue_counts"].items()))
 
 if __name__ == "__main__":
-    df_res = evaluate_csv(CSV_PATH)
-    summarize_and_write(df_res)
-    print("评估完成，结果已保存到 eval_output/")
\ No newline at end of file
+    stats = evaluate_csv_stream(CSV_PATH, os.path.join(OUT_DIR, "detailed_results.csv"))
+    write_summary(stats)
+    print("评估完成，结果已保存到 eval_output/")
@@ -0,0 +1,171 @@
+import random
+
+import pandas as pd
+import pytest
+
+import judge
+
+UNICODE_CASES = [
+    "ΑΣ", "İ", "李四 Σ", "kg/m³ ½ a\x1cb é (x) Ⅻ ١٢",
+    "查询结果显示，2025年6月27日 订单 88.0", "如下88.0²", "1.0.0.0 x", "值为 ３.５ １２",
+    "", " 分别为 张三、李四 和 王五 ", "Final Answer: 1,234.5; -7 +.5",
+]
+
+
+def _fuzz_strings(n=3000, seed=0):
+    """由易出差异的字符随机拼出测试串。"""
+    rng = random.Random(seed)
+    alphabet = list("ΑΣİ aZé³²½如下查询结果显示其得分为0.1-,，;；年月日2025 \x1c_&和Ⅻ١３́")
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 16))) for _ in range(n)]
+
+
+def test_batch_normalize_matches_normalize_text_without_polars(monkeypatch):
+    monkeypatch.setattr(judge, "pl", None)
+    texts = UNICODE_CASES + _fuzz_strings()
+    assert list(judge._batch_normalize(pd.Series(texts))) == [judge.normalize_text(t) for t in texts]
+
+
+@pytest.mark.skipif(judge.pl is None, reason="polars未安装")
+def test_batch_normalize_matches_normalize_text_with_polars():
+    rng = random.Random(1)
+    float_chains = [''.join(rng.choice(".0x ²") for _ in range(12)) for _ in range(2000)]
+    float_chains += ["1" + ".0" * k + tail for k in range(1, 8) for tail in ["", "5", ".", " x", "a", "²"]]
+    texts = UNICODE_CASES + _fuzz_strings() + float_chains
+    assert list(judge._batch_normalize(pd.Series(texts))) == [judge.normalize_text(t) for t in texts]
+
+
+@pytest.mark.parametrize("use_polars", [True, False])
+def test_extract_numbers_batch_matches_extract_numbers(monkeypatch, use_polars):
+    if not use_polars:
+        monkeypatch.setattr(judge, "pl", None)
+    elif judge.pl is None:
+        pytest.skip("polars未安装")
+    texts = UNICODE_CASES + ["值为 ３.５", "１２", "1,234 和 ١٢ 以及 -0.5"] + _fuzz_strings()
+    found = judge.extract_numbers_batch(pd.Series(texts))
+    assert [list(nums) for nums in found] == [judge.extract_numbers(t) for t in texts]
+
+
+def _write_chat_csv(path, rows):
+    pd.DataFrame(rows, columns=["id", "role", "content", "timestamp", "file_name", "expected_answer"]).to_csv(path, index=False)
+
+
+def _chat_rows(n):
+    answers = ["张三, 李四", "2025年6月27日", "88.0", "ΑΣ", "值为 ３.５", "None", "NA"]
+    return [
+        [f"m{i}" if i % 5 else "", "assistant", f"查询结果显示，\n{answers[i % 7]} 其他 {i}", "", "1-2.xlsx", answers[(i + i // 7) % 7]]
+        for i in range(n)
+    ]
+
+
+def test_parallel_evaluation_matches_single_process(tmp_path):
+    small, mid = tmp_path / "small.csv", tmp_path / "mid.csv"
+    _write_chat_csv(small, _chat_rows(20))
+    _write_chat_csv(mid, _chat_rows(600))
+    judge.evaluate_csv(str(small))  # 先在本进程跑一次，让polars等起线程池
+    parallel = judge.evaluate_csv(str(mid), chunk_size=150, workers=2)
+    assert parallel.equals(judge.evaluate_csv(str(mid), workers=1))
+
+
+def test_single_full_chunk_runs_in_process(tmp_path, monkeypatch):
+    path = tmp_path / "one.csv"
+    _write_chat_csv(path, _chat_rows(100))
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("只有一块输入时不应创建进程池")
+
+    monkeypatch.setattr(judge, "ProcessPoolExecutor", no_pool)
+    assert len(judge.evaluate_csv(str(path), chunk_size=100, workers=4)) == 100
+
+
+@pytest.mark.skipif(judge.pacsv is None, reason="pyarrow未安装")
+def test_arrow_reader_handles_multiline_values_across_blocks(tmp_path):
+    path = tmp_path / "multiline.csv"
+    rows = [[f"m{i}", "assistant", "第一行\n第二行\n" * 80 + str(i), "", "1-2.xlsx", str(i)] for i in range(1500)]
+    _write_chat_csv(path, rows)
+    assert path.stat().st_size > 2 << 20  # 超过pyarrow默认的1MB分块
+    df = judge.read_csv(str(path))
+    assert len(df) == 1500 and df["content"].iloc[-1].endswith("1499")
+    chunks = list(judge.read_csv_chunks(str(path), 400))
+    assert [len(c) for c in chunks] == [400, 400, 400, 300]
+    assert list(pd.concat(chunks)["id"]) == list(df["id"])
+
+
+@pytest.mark.parametrize("use_arrow", [True, False])
+def test_csv_readers_keep_answers_as_strings(tmp_path, monkeypatch, use_arrow):
+    if not use_arrow:
+        monkeypatch.setattr(judge, "pacsv", None)
+    elif judge.pacsv is None:
+        pytest.skip("pyarrow未安装")
+    path = tmp_path / "na.csv"
+    _write_chat_csv(path, [["2", "assistant", "NA", "", "1-2.xlsx", "None"], ["007", "assistant", "", "", "", "NA"]])
+    for df in [judge.read_csv(str(path)), pd.concat(judge.read_csv_chunks(str(path), 1))]:
+        assert sorted(df.columns) == sorted(judge.INPUT_COLUMNS)
+        assert list(df["id"]) == ["2", "007"]
+        assert list(df["content"]) == ["NA", ""]
+        assert list(df["expected_answer"]) == ["None", "NA"]
+
+
+PAIRS = [
+    ("查询结果显示，2025年6月27日 订单 88.0", "2025-06-27"), ("日期为 2025/6/27", "2025年06月27日"),
+    ("如下：张三、李四 和 王五", "王五, 张三, 李四"), ("分别为 张三 李四", "张三、李四、赵六"),
+    ("其得分为 ３.５ 分", "3.5"), ("值为 １２", "12.0"), ("答案是 １２ 个", "Σ 12.0 x&y"),
+    ("Final Answer: 1,234.5; -7 +.5", "1234.5 和 -7"), ("约为 88.04", "88"), ("结果 0", "0.0"),
+    ("ΑΣ", "ασ"), ("İstanbul", "i̇stanbul"), ("kg/m³ ½", "kg/m3"), ("Ⅻ ١٢", "12"),
+    ("", ""), ("", "NA"), ("None", ""), ("完全不同的回答", "张三"), ("1.0.0.0 x", "1 x"),
+]
+
+
+@pytest.fixture(params=["installed", "disabled"])
+def backends(request, monkeypatch):
+    """分别在已安装的可选加速库下和全部禁用（纯Python回退）时运行。"""
+    if request.param == "disabled":
+        for name in ["pl", "_STOPWORD_AUTOMATON", "simsimd", "match_nums", "fuzz"]:
+            monkeypatch.setattr(judge, name, None)
+    judge.normalize_text.cache_clear()
+    judge._tokens.cache_clear()
+    yield request.param
+    judge.normalize_text.cache_clear()
+    judge._tokens.cache_clear()
+
+
+def test_evaluate_batch_matches_evaluate_row(backends):
+    rng = random.Random(2)
+    fuzz = _fuzz_strings(1000, seed=3)
+    pairs = PAIRS + [(a, rng.choice(fuzz + [a[:4], a[2:]])) for a in fuzz]
+    pairs += [(row[2], row[5]) for row in _chat_rows(70)]
+    contents, expected = zip(*pairs)
+    batch = judge.evaluate_batch(contents, expected)
+    assert batch == [judge.evaluate_row(a, e) for a, e in pairs]
+    assert all(type(r[k]) is float for r in batch for k in ["combined_score", "seq_ratio"])
+
+
+def test_raw_containment_shortcut_keeps_numeric_answers_wrong():
+    assert judge.evaluate_row("88.0", "0")["verdict"] == "错误"
+    assert judge.evaluate_batch(["88.0", "88.0 张三, 李四"], ["0", "0"])[1]["verdict"] == "错误"
+
+
+@pytest.mark.parametrize("ai, expected", [("2025年6月27日", "6月27日"), ("ΑΣ", "Σ"), ("如下张三", "下张"), ("1.0.0 x", "0 x")])
+def test_raw_containment_shortcut_matches_full_normalization(monkeypatch, ai, expected):
+    row, batch = judge.evaluate_row(ai, expected), judge.evaluate_batch([ai], [expected])[0]
+    monkeypatch.setattr(judge, "_raw_contained", lambda e, a: False)
+    assert row == batch == judge.evaluate_row(ai, expected)
+
+
+def test_raw_containment_implies_normalized_containment():
+    rng = random.Random(4)
+    for a in _fuzz_strings(20000, seed=5):
+        i = rng.randint(0, len(a))
+        e = a[i:rng.randint(i, len(a))]
+        if judge._raw_contained(e, a):
+            assert judge.normalize_text(e) in judge.normalize_text(a), (a, e)
+
+
+def test_evaluate_csv_defaults_to_single_process(tmp_path, monkeypatch):
+    path = tmp_path / "multi.csv"
+    _write_chat_csv(path, _chat_rows(300))
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("evaluate_csv默认不应创建进程池")
+
+    monkeypatch.setattr(judge, "ProcessPoolExecutor", no_pool)
+    assert len(judge.evaluate_csv(str(path), chunk_size=100)) == 300